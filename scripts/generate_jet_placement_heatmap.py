@@ -6,10 +6,21 @@ Creates a bubble map showing where JETAASC subscribers were placed
 
 import csv
 import re
-from collections import Counter
+from collections import Counter, defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 import json
 import argparse
 import os
+from pathlib import Path
+
+# Optional fast JSON serializer; the scripts stay stdlib-only without it
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _dumps = json.dumps
 
 # Japanese prefecture coordinates (capital cities)
 PREFECTURE_COORDS = {
@@ -78,6 +89,28 @@ PREFECTURE_ALIASES = {
     'Kanagawa Pref.神奈川県': 'Kanagawa',
 }
 
+def _build_prefecture_lookup():
+    """Build a lowercase spelling -> canonical name table for O(1) lookups"""
+    lookup = {}
+    for name in PREFECTURE_COORDS:
+        low = name.lower()
+        lookup[low] = name
+        # Common suffixed forms, e.g. "tokyo-to", "hyogo pref."
+        for suffix in (' pref.', '-to', '-fu', '-ken'):
+            lookup[low + suffix] = name
+    for alias, name in PREFECTURE_ALIASES.items():
+        lookup[alias.lower()] = name
+    return lookup
+
+# Frozen so readers (and tooling) know the merged table is never mutated
+PREFECTURE_LOOKUP = MappingProxyType(_build_prefecture_lookup())
+
+# Matches any prefecture name embedded in a longer string, in one C-level scan
+ALIAS_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(name) for name in PREFECTURE_COORDS) + r')\b',
+    re.IGNORECASE)
+
+@lru_cache(maxsize=256)
 def normalize_prefecture(pref):
     """Normalize prefecture name"""
     if not pref or pref.strip() == '' or pref == 'N/A':
@@ -85,14 +118,15 @@ def normalize_prefecture(pref):
 
     pref = pref.strip().strip('"')
 
-    # Check aliases first
-    if pref in PREFECTURE_ALIASES:
-        return PREFECTURE_ALIASES[pref]
+    # Exact lookup against every known spelling
+    known = PREFECTURE_LOOKUP.get(pref.lower())
+    if known:
+        return known
 
-    # Check if it's a known prefecture
-    for known in PREFECTURE_COORDS.keys():
-        if known.lower() in pref.lower() or pref.lower() in known.lower():
-            return known
+    # Loose fallback for uncommon strings: single regex scan over all names
+    match = ALIAS_RE.search(pref)
+    if match:
+        return PREFECTURE_LOOKUP[match.group(1).lower()]
 
     return None
 
@@ -105,28 +139,37 @@ def main():
     csv_path = args.csv_path
     output_path = args.output
 
-    prefectures = Counter()
-    locations = {}
+    # One bulk read and one decode pass beats per-line buffered text I/O
+    # for these startup-dominated exports; Counter then bulk-counts the raw
+    # values at C speed so normalization runs once per distinct spelling
+    with open(csv_path, 'rb') as f:
+        lines = f.read().decode('utf-8').splitlines()
+
+    reader = csv.reader(lines)
+    header = next(reader, [])
+    idx = header.index('JET Prefecture')
+    raw_counts = Counter(row[idx] if idx < len(row) else '' for row in reader)
 
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        total = 0
-        mapped = 0
+    total = sum(raw_counts.values())
 
-        for row in reader:
-            total += 1
-            pref_raw = row.get('JET Prefecture', '')
-            pref = normalize_prefecture(pref_raw)
+    # Accumulate in a plain defaultdict (C-level missing-key handling) and
+    # convert to a Counter once for most_common; total and mapped both fall
+    # out of the counts rather than being tracked per row
+    counts = defaultdict(int)
+    for pref_raw, count in raw_counts.items():
+        pref = normalize_prefecture(pref_raw)
 
-            if pref and pref in PREFECTURE_COORDS:
-                mapped += 1
-                prefectures[pref] += 1
+        if pref and pref in PREFECTURE_COORDS:
+            counts[pref] += count
 
-                lat, lng, name = PREFECTURE_COORDS[pref]
-                key = (lat, lng)
-                if key not in locations:
-                    locations[key] = {'count': 0, 'name': name, 'lat': lat, 'lng': lng}
-                locations[key]['count'] += 1
+    prefectures = Counter(counts)
+    mapped = sum(prefectures.values())
+
+    # locations is a pure function of prefectures; build it once
+    locations = {}
+    for pref, count in prefectures.items():
+        lat, lng, name = PREFECTURE_COORDS[pref]
+        locations[(lat, lng)] = {'count': count, 'name': name, 'lat': lat, 'lng': lng}
 
     # Print summary
     print(f"\n=== JET Placement Analysis ===")
@@ -134,25 +177,51 @@ def main():
     print(f"With JET placement data: {mapped} ({mapped*100//total}%)")
     print(f"Prefectures represented: {len(prefectures)}")
 
+    # One heap scan serves the summary, the chart, and the stats box
+    top20 = prefectures.most_common(20)
+
     print(f"\n--- Top Prefectures ---")
-    for pref, count in prefectures.most_common(20):
+    for pref, count in top20:
         print(f"  {pref}: {count}")
 
     # Generate HTML
-    generate_html(prefectures, locations, total, mapped, output_path)
+    generate_html(prefectures, top20, locations, total, mapped, output_path)
     print(f"\n✓ Generated: {output_path}")
 
-def generate_html(prefectures, locations, total, mapped, output_path):
+def generate_html(prefectures, top20, locations, total, mapped, output_path):
     """Generate interactive HTML with Leaflet bubble map of Japan"""
 
+    # Positional [lat, lng, count, name] rows, coords rounded to 4 decimals
+    # (~11 m) -- smaller payload, same bubble placement
     loc_data = [
-        {'lat': v['lat'], 'lng': v['lng'], 'count': v['count'], 'name': v['name']}
+        [round(v['lat'], 4), round(v['lng'], 4), v['count'], v['name']]
         for v in locations.values()
     ]
 
-    pref_data = list(prefectures.most_common(15))
-
-    html = f'''<!DOCTYPE html>
+    # Single pass over the top prefectures for the bar chart payload
+    labels, values = [], []
+    for name, count in top20[:15]:
+        labels.append(name)
+        values.append(count)
+
+    # The page is a few hundred KB at most; join the parts and write once
+    parts = (
+        HTML_HEAD_TMPL.format(
+            total=total,
+            mapped=mapped,
+            num_prefectures=len(prefectures),
+            top_prefecture=top20[0][0] if top20 else 'N/A',
+        ),
+        _dumps(loc_data),
+        HTML_MID,
+        _dumps({'labels': labels, 'values': values}),
+        HTML_TAIL,
+    )
+    Path(output_path).write_text(''.join(parts), encoding='utf-8')
+
+# Static template pieces; generate_html streams these around the JSON
+# payloads instead of building one giant string
+HTML_HEAD_TMPL = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -254,11 +323,11 @@ def generate_html(prefectures, locations, total, mapped, output_path):
             <div class="stat-label">With Placement Data</div>
         </div>
         <div class="stat-box">
-            <div class="stat-number">{len(prefectures)}</div>
+            <div class="stat-number">{num_prefectures}</div>
             <div class="stat-label">Prefectures</div>
         </div>
         <div class="stat-box">
-            <div class="stat-number">{prefectures.most_common(1)[0][0]}</div>
+            <div class="stat-number">{top_prefecture}</div>
             <div class="stat-label">Top Prefecture</div>
         </div>
     </div>
@@ -292,34 +361,37 @@ def generate_html(prefectures, locations, total, mapped, output_path):
         }}).addTo(map);
 
         // Location data
-        const locations = {json.dumps(loc_data)};
+        const locations = '''
+
+HTML_MID = ''';
 
         // Color scale based on count
-        function getColor(count) {{
+        function getColor(count) {
             if (count >= 50) return '#e63946';
             if (count >= 36) return '#ff6b35';
             if (count >= 26) return '#ffbe0b';
             if (count >= 16) return '#8ac926';
             return '#00b4d8';
-        }}
+        }
 
         // Add circles for each location
-        locations.forEach(loc => {{
-            const radius = Math.sqrt(loc.count) * 8000;
-            const color = getColor(loc.count);
-            L.circle([loc.lat, loc.lng], {{
+        locations.forEach(([lat, lng, count, name]) => {
+            const radius = Math.sqrt(count) * 8000;
+            const color = getColor(count);
+            L.circle([lat, lng], {
                 color: color,
                 fillColor: color,
                 fillOpacity: 0.5,
                 weight: 2,
                 radius: Math.max(radius, 15000)
-            }}).addTo(map)
-              .bindPopup(`<strong>${{loc.name}}</strong><br>${{loc.count}} JET${{loc.count > 1 ? 's' : ''}} placed here`);
-        }});
+            }).addTo(map)
+              .bindPopup(`<strong>${name}</strong><br>${count} JET${count > 1 ? 's' : ''} placed here`);
+        });
 
         // Bar chart
-        const prefLabels = {json.dumps([p[0] for p in pref_data])};
-        const prefValues = {json.dumps([p[1] for p in pref_data])};
+        const prefData = '''
+
+HTML_TAIL = ''';
 
         const colors = [
             '#e63946', '#f15a24', '#ff6b35', '#ff8c42', '#ffbe0b',
@@ -327,38 +399,35 @@ def generate_html(prefectures, locations, total, mapped, output_path):
             '#1b4332', '#00b4d8', '#0096c7', '#0077b6', '#023e8a'
         ];
 
-        new Chart(document.getElementById('prefChart'), {{
+        new Chart(document.getElementById('prefChart'), {
             type: 'bar',
-            data: {{
-                labels: prefLabels,
-                datasets: [{{
-                    data: prefValues,
+            data: {
+                labels: prefData.labels,
+                datasets: [{
+                    data: prefData.values,
                     backgroundColor: colors,
                     borderRadius: 6,
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 indexAxis: 'y',
                 responsive: true,
-                plugins: {{ legend: {{ display: false }} }},
-                scales: {{
-                    x: {{
-                        grid: {{ color: '#333' }},
-                        ticks: {{ color: '#888' }}
-                    }},
-                    y: {{
-                        grid: {{ display: false }},
-                        ticks: {{ color: '#eee' }}
-                    }}
-                }}
-            }}
-        }});
+                plugins: { legend: { display: false } },
+                scales: {
+                    x: {
+                        grid: { color: '#333' },
+                        ticks: { color: '#888' }
+                    },
+                    y: {
+                        grid: { display: false },
+                        ticks: { color: '#eee' }
+                    }
+                }
+            }
+        });
     </script>
 </body>
 </html>'''
 
-    with open(output_path, 'w') as f:
-        f.write(html)
-
 if __name__ == '__main__':
     main()
@@ -6,10 +6,23 @@ Parses Address field to extract zip codes and creates bubble map visualization
 
 import csv
 import re
+from bisect import bisect_right
 from collections import Counter
+from functools import lru_cache
+import io
 import json
 import argparse
 import os
+from string import Template
+
+# Optional fast JSON serializer; the scripts stay stdlib-only without it
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
 
 # US state abbreviations
 STATE_ABBREV = {
@@ -28,6 +41,10 @@ STATE_ABBREV = {
     'WI': 'Wisconsin', 'WY': 'Wyoming', 'DC': 'District of Columbia'
 }
 
+# Membership-only view for the parser hot path; the dict above stays for
+# resolving full names in the chart
+STATE_CODES = frozenset(STATE_ABBREV)
+
 # Approximate coordinates for CA zip code prefixes (first 3 digits) and other areas
 # Format: prefix -> (lat, lng, area_name)
 ZIP_COORDS = {
@@ -464,44 +481,62 @@ ZIP_COORDS = {
     '92887': (33.8897, -117.7428, 'Yorba Linda'),
 }
 
+# Compiled once at import; one pass captures city, state, and zip together
+ZIP_RE = re.compile(r'\b(\d{5})\b')
+ADDR_RE = re.compile(r'([A-Za-z][A-Za-z\s\.]*?)[,\s]+([A-Z]{2})\s+(\d{5})\b',
+                     re.IGNORECASE)
+
+@lru_cache(maxsize=65536)
 def parse_address(address):
-    """Extract city, state, and zip from address string"""
+    """Extract state and zip from address string"""
     if not address or address.strip() == '':
-        return None, None, None
-
-    address_upper = address.upper()
-
-    # Try to find 5-digit zip code
-    zip_match = re.search(r'\b(\d{5})\b', address)
-    zip_code = zip_match.group(1) if zip_match else None
-
-    # Look for 2-letter state code
-    state = None
-    state_match = re.search(r'\b([A-Z]{2})\s+\d{5}', address_upper)
-    if state_match:
-        potential_state = state_match.group(1)
-        if potential_state in STATE_ABBREV:
-            state = potential_state
-
-    # Extract city
-    city = None
-    if state:
-        city_match = re.search(r'([A-Za-z\s\.]+?)\s+' + state + r'\s+\d{5}', address, re.IGNORECASE)
-        if city_match:
-            city = city_match.group(1).strip().strip('.')
-
-    return city, state, zip_code
-
-def get_coords(zip_code, state):
+        return None, None
+
+    # Fast path: addresses ending in "ST 12345" need no regex at all.
+    # The state code must start the string or follow a separator, so
+    # "Topanga 90290" still falls through and parses as state-less rather
+    # than being misread as GA, while a bare "CA 90210" (no city, which
+    # ADDR_RE would reject but the baseline parser accepted) still counts.
+    stripped = address.rstrip()
+    if (len(stripped) >= 8 and stripped[-5:].isdigit()
+            and stripped[-6] == ' ' and stripped[-8:-6].isalpha()
+            and (len(stripped) == 8 or stripped[-9] == ','
+                 or stripped[-9].isspace())):
+        state = stripped[-8:-6].upper()
+        if state in STATE_CODES:
+            return state, stripped[-5:]
+
+    match = ADDR_RE.search(address)
+    if not match:
+        # No recognizable "city ST zip" shape; salvage a bare zip if present
+        zip_match = ZIP_RE.search(address)
+        return None, zip_match.group(1) if zip_match else None
+
+    state = match.group(2).upper()
+    zip_code = match.group(3)
+
+    if state not in STATE_CODES:
+        return None, zip_code
+
+    return state, zip_code
+
+# Split the mixed table once at import: exact 5-digit zips and 3-digit
+# prefixes, both keyed by int (faster hashing, no length check per lookup)
+ZIP5 = {}
+ZIP3 = {}
+for _zip, _coords in ZIP_COORDS.items():
+    (ZIP5 if len(_zip) == 5 else ZIP3)[int(_zip)] = _coords
+
+def get_coords(zip_code, state, _zip5_get=ZIP5.get, _zip3_get=ZIP3.get):
     """Get coordinates for a zip code or state"""
     if zip_code:
-        # Try exact zip match first
-        if zip_code in ZIP_COORDS:
-            return ZIP_COORDS[zip_code]
-        # Try 3-digit prefix
-        prefix = zip_code[:3]
-        if prefix in ZIP_COORDS:
-            return ZIP_COORDS[prefix]
+        zip_int = int(zip_code)
+        # Try exact zip match first, then the 3-digit prefix; the table
+        # lookups are bound as locals since the tables never change
+        coords = _zip5_get(zip_int)
+        if coords is None:
+            coords = _zip3_get(zip_int // 100)
+        return coords
     return None
 
 def main():
@@ -514,31 +549,44 @@ def main():
     output_path = args.output
 
     states = Counter()
-    locations = {}  # (lat, lng) -> {'count': n, 'name': name}
-
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        total = 0
-        parsed = 0
-        geocoded = 0
-
-        for row in reader:
-            total += 1
-            address = row.get('Address', '')
-            city, state, zip_code = parse_address(address)
-
-            if state:
-                parsed += 1
-                states[state] += 1
-
-                coords = get_coords(zip_code, state)
-                if coords:
-                    geocoded += 1
-                    lat, lng, name = coords
-                    key = (lat, lng)
-                    if key not in locations:
-                        locations[key] = {'count': 0, 'name': name, 'lat': lat, 'lng': lng}
-                    locations[key]['count'] += 1
+    locations = Counter()  # (lat, lng) -> subscriber count
+    area_names = {}  # (lat, lng) -> first-seen display name
+
+    # Bulk-count raw addresses at C speed, then parse each distinct string
+    # once and scale by its multiplicity
+    # A 1 MiB read buffer cuts syscalls and decoder state churn on large
+    # exports; newline='' is what the csv module expects
+    with open(csv_path, 'rb', buffering=1 << 20) as raw, \
+            io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        addr_idx = header.index('Address')
+        raw_counts = Counter(
+            row[addr_idx] if addr_idx < len(row) else '' for row in reader)
+
+    total = sum(raw_counts.values())
+
+    # No-address rows can't parse to anything; drop the bucket up front
+    raw_counts.pop('', None)
+
+    parsed = 0
+    geocoded = 0
+
+    for address, count in raw_counts.items():
+        state, zip_code = parse_address(address)
+
+        if state:
+            parsed += count
+            states[state] += count
+
+            coords = get_coords(zip_code, state)
+            if coords:
+                geocoded += count
+                # Key by coordinate only: some zip prefixes share a point
+                # under different names, and those merge into one bubble
+                lat, lng, name = coords
+                locations[(lat, lng)] += count
+                area_names.setdefault((lat, lng), name)
 
     # Print summary
     print(f"\n=== Geographic Analysis ===")
@@ -547,27 +595,65 @@ def main():
     print(f"Geocoded to coordinates: {geocoded}")
 
     print(f"\n--- Top Locations ---")
-    sorted_locs = sorted(locations.values(), key=lambda x: -x['count'])[:25]
-    for loc in sorted_locs:
-        print(f"  {loc['name']}: {loc['count']}")
+    # most_common delegates to heapq.nlargest: O(N log 25), no full sort
+    for key, count in locations.most_common(25):
+        print(f"  {area_names[key]}: {count}")
 
     # Generate HTML
-    generate_html(states, locations, total, parsed, geocoded, output_path)
+    generate_html(states, locations, area_names, total, parsed, geocoded,
+                  output_path)
     print(f"\n✓ Generated: {output_path}")
 
-def generate_html(states, locations, total, parsed, geocoded, output_path):
+# Legend thresholds; bisecting these yields the palette index 0..4
+COLOR_BUCKETS = (3, 5, 10, 20)
+
+def generate_html(states, locations, area_names, total, parsed, geocoded,
+                  output_path):
     """Generate interactive HTML with Leaflet bubble map"""
 
-    # Prepare location data for map
-    loc_data = [
-        {'lat': v['lat'], 'lng': v['lng'], 'count': v['count'], 'name': v['name']}
-        for v in locations.values()
-    ]
+    # Parallel-array (SoA) location payload: the JS draw loop reads by
+    # index instead of allocating one object per location
+    lats, lngs, counts, names = [], [], [], []
+    color_idx, radii = [], []
+    for (lat, lng), count in locations.items():
+        # Fixed-point int coords (1e-5 deg ~ 1 m): short ints serialize and
+        # parse much faster than long decimal floats
+        lats.append(round(lat * 100000))
+        lngs.append(round(lng * 100000))
+        counts.append(count)
+        names.append(area_names[(lat, lng)])
+        # Bucket into the 5-color legend and bake the radius (in screen
+        # pixels), so the JS draw loop is pure array reads
+        color_idx.append(bisect_right(COLOR_BUCKETS, count))
+        radii.append(round(max((count ** 0.5) * 3, 4)))
+    loc_data = {'lats': lats, 'lngs': lngs, 'counts': counts,
+                'names': names, 'colorIdx': color_idx, 'radii': radii}
 
     # Prepare state data for bar chart
     state_data = [(STATE_ABBREV.get(s, s), c) for s, c in states.most_common(15)]
 
-    html = f'''<!DOCTYPE html>
+    # orjson writes raw UTF-8 (names like "La Cañada"); pin the encoding so
+    # the file matches the page's charset regardless of platform locale
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(HTML_HEAD_TMPL.substitute(
+            total=f'{total:,}',
+            geocoded=geocoded,
+            ca=f"{states.get('CA', 0):,}",
+            az=f"{states.get('AZ', 0):,}",
+            num_areas=f'{len(locations):,}',
+        ))
+        f.write(_dumps(loc_data))
+        f.write(HTML_MID)
+        f.write(_dumps([s[0] for s in state_data]))
+        f.write(';\n        const stateValues = ')
+        f.write(_dumps([s[1] for s in state_data]))
+        f.write(HTML_TAIL)
+
+# Static template pieces; generate_html streams these around the JSON
+# payloads instead of building one giant string. The head is a
+# string.Template, parsed once at import; $-placeholders mean the CSS/JS
+# braces below need no escaping
+HTML_HEAD_TMPL = Template('''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -577,107 +663,107 @@ def generate_html(states, locations, total, parsed, geocoded, output_path):
     <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: #1a1a2e;
             color: #eee;
-        }}
-        .header {{
+        }
+        .header {
             padding: 1.5rem 2rem;
             text-align: center;
-        }}
-        h1 {{ color: #fff; margin-bottom: 0.5rem; }}
-        .subtitle {{ color: #888; }}
-        .stats {{
+        }
+        h1 { color: #fff; margin-bottom: 0.5rem; }
+        .subtitle { color: #888; }
+        .stats {
             display: flex;
             justify-content: center;
             gap: 2rem;
             padding: 1rem 2rem;
             flex-wrap: wrap;
-        }}
-        .stat-box {{
+        }
+        .stat-box {
             background: #16213e;
             padding: 1rem 1.5rem;
             border-radius: 10px;
             text-align: center;
             min-width: 120px;
-        }}
-        .stat-number {{
+        }
+        .stat-number {
             font-size: 1.8rem;
             font-weight: bold;
             color: #4ecca3;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             color: #888;
             font-size: 0.85rem;
             margin-top: 0.25rem;
-        }}
-        #map {{
+        }
+        #map {
             height: 500px;
             width: 100%;
             border-top: 1px solid #333;
             border-bottom: 1px solid #333;
-        }}
-        .chart-section {{
+        }
+        .chart-section {
             padding: 2rem;
             max-width: 800px;
             margin: 0 auto;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background: #16213e;
             padding: 1.5rem;
             border-radius: 12px;
-        }}
-        .chart-container h2 {{
+        }
+        .chart-container h2 {
             margin-bottom: 1rem;
             font-size: 1.1rem;
             color: #4ecca3;
-        }}
-        .legend {{
+        }
+        .legend {
             padding: 1rem 2rem;
             text-align: center;
             color: #888;
             font-size: 0.9rem;
-        }}
-        .legend-item {{
+        }
+        .legend-item {
             display: inline-flex;
             align-items: center;
             margin: 0 1rem;
-        }}
-        .legend-circle {{
+        }
+        .legend-circle {
             width: 20px;
             height: 20px;
             border-radius: 50%;
             background: rgba(78, 204, 163, 0.6);
             border: 2px solid #4ecca3;
             margin-right: 0.5rem;
-        }}
-        .legend-circle.small {{ width: 10px; height: 10px; }}
-        .legend-circle.large {{ width: 30px; height: 30px; }}
+        }
+        .legend-circle.small { width: 10px; height: 10px; }
+        .legend-circle.large { width: 30px; height: 30px; }
     </style>
 </head>
 <body>
     <div class="header">
         <h1>JETAASC Subscriber Map</h1>
-        <p class="subtitle">Geographic distribution of {geocoded} subscribers with mappable addresses</p>
+        <p class="subtitle">Geographic distribution of $geocoded subscribers with mappable addresses</p>
     </div>
 
     <div class="stats">
         <div class="stat-box">
-            <div class="stat-number">{total:,}</div>
+            <div class="stat-number">$total</div>
             <div class="stat-label">Total Subscribers</div>
         </div>
         <div class="stat-box">
-            <div class="stat-number">{states.get('CA', 0):,}</div>
+            <div class="stat-number">$ca</div>
             <div class="stat-label">California</div>
         </div>
         <div class="stat-box">
-            <div class="stat-number">{states.get('AZ', 0):,}</div>
+            <div class="stat-number">$az</div>
             <div class="stat-label">Arizona</div>
         </div>
         <div class="stat-box">
-            <div class="stat-number">{len(locations):,}</div>
+            <div class="stat-number">$num_areas</div>
             <div class="stat-label">Unique Areas</div>
         </div>
     </div>
@@ -703,42 +789,61 @@ def generate_html(states, locations, total, parsed, geocoded, output_path):
         // Initialize map centered on LA area
         const map = L.map('map').setView([34.0, -118.0], 9);
 
+        // One shared canvas renderer: circles composite into a single
+        // <canvas> instead of one SVG node each
+        const renderer = L.canvas({ padding: 0.5 });
+
         // Dark map tiles
-        L.tileLayer('https://{{s}}.basemaps.cartocdn.com/dark_all/{{z}}/{{x}}/{{y}}{{r}}.png', {{
+        L.tileLayer('https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}{r}.png', {
             attribution: '&copy; OpenStreetMap contributors &copy; CARTO',
             subdomains: 'abcd',
             maxZoom: 19
-        }}).addTo(map);
+        }).addTo(map);
 
         // Location data
-        const locations = {json.dumps(loc_data)};
-
-        // Color scale based on count
-        function getColor(count) {{
-            if (count >= 20) return '#ff2d55';      // Hot pink - high
-            if (count >= 10) return '#ff6b35';      // Orange - medium-high
-            if (count >= 5) return '#ffbe0b';       // Yellow - medium
-            if (count >= 3) return '#8ac926';       // Lime - low-medium
-            return '#00b4d8';                        // Cyan - low
-        }}
-
-        // Add circles for each location
-        locations.forEach(loc => {{
-            const radius = Math.sqrt(loc.count) * 4000;
-            const color = getColor(loc.count);
-            L.circle([loc.lat, loc.lng], {{
+        const locations = ''')
+
+HTML_MID = ''';
+
+        // Count buckets (low to high); indices are precomputed in Python
+        const PALETTE = ['#00b4d8', '#8ac926', '#ffbe0b', '#ff6b35', '#ff2d55'];
+
+        // Add circles for each location: typed parallel arrays, indexed loop
+        const lats = Float32Array.from(locations.lats, v => v * 1e-5);
+        const lngs = Float32Array.from(locations.lngs, v => v * 1e-5);
+        const counts = new Uint16Array(locations.counts);
+        const colorIdx = new Uint8Array(locations.colorIdx);
+        const radii = new Float32Array(locations.radii);
+        const names = locations.names;
+        const circles = L.featureGroup().addTo(map);
+        for (let i = 0; i < lats.length; i++) {
+            const color = PALETTE[colorIdx[i]];
+            const circle = L.circleMarker([lats[i], lngs[i]], {
+                renderer: renderer,
                 color: color,
                 fillColor: color,
                 fillOpacity: 0.5,
                 weight: 2,
-                radius: Math.max(radius, 1500)
-            }}).addTo(map)
-              .bindPopup(`<strong>${{loc.name}}</strong><br>${{loc.count}} subscriber${{loc.count > 1 ? 's' : ''}}`);
-        }});
+                radius: radii[i]
+            });
+            circle.locIdx = i;
+            circles.addLayer(circle);
+        }
+
+        // One delegated click handler and one shared popup instead of a
+        // bound popup and listener per circle
+        const popup = L.popup();
+        circles.on('click', e => {
+            const i = e.propagatedFrom.locIdx;
+            popup.setLatLng(e.propagatedFrom.getLatLng())
+                 .setContent(`<strong>${names[i]}</strong><br>${counts[i]} subscriber${counts[i] > 1 ? 's' : ''}`)
+                 .openOn(map);
+        });
 
         // Bar chart
-        const stateLabels = {json.dumps([s[0] for s in state_data])};
-        const stateValues = {json.dumps([s[1] for s in state_data])};
+        const stateLabels = '''
+
+HTML_TAIL = ''';
 
         const colors = [
             '#4ecca3', '#45b7aa', '#3ca4b1', '#3391b8', '#2a7ebf',
@@ -746,38 +851,37 @@ def generate_html(states, locations, total, parsed, geocoded, output_path):
             '#be3787', '#d72d75', '#e63946', '#f15a24', '#f99d1c'
         ];
 
-        new Chart(document.getElementById('stateChart'), {{
+        new Chart(document.getElementById('stateChart'), {
             type: 'bar',
-            data: {{
+            data: {
                 labels: stateLabels,
-                datasets: [{{
+                datasets: [{
                     data: stateValues,
                     backgroundColor: colors,
                     borderRadius: 6,
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 indexAxis: 'y',
                 responsive: true,
-                plugins: {{ legend: {{ display: false }} }},
-                scales: {{
-                    x: {{
-                        grid: {{ color: '#333' }},
-                        ticks: {{ color: '#888' }}
-                    }},
-                    y: {{
-                        grid: {{ display: false }},
-                        ticks: {{ color: '#eee' }}
-                    }}
-                }}
-            }}
-        }});
+                animation: false,
+                normalized: true,
+                plugins: { legend: { display: false } },
+                scales: {
+                    x: {
+                        grid: { color: '#333' },
+                        ticks: { color: '#888' }
+                    },
+                    y: {
+                        grid: { display: false },
+                        ticks: { color: '#eee' }
+                    }
+                }
+            }
+        });
     </script>
 </body>
 </html>'''
 
-    with open(output_path, 'w') as f:
-        f.write(html)
-
 if __name__ == '__main__':
     main()